@@ -0,0 +1,23 @@
+"""
+Django settings for running the FoodApp test suite.
+
+Usage: python manage.py test --settings=FoodApp.test_settings
+"""
+
+from FoodApp.settings import *  # noqa: F401,F403
+
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    }
+}
+
+# Password hashing speed is irrelevant for tests, skip the PBKDF2 rounds
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+# Build test tables straight from the models instead of replaying migrations
+MIGRATION_MODULES = {app.rsplit('.', 1)[-1]: None for app in INSTALLED_APPS}  # noqa: F405
@@ -0,0 +1,17 @@
+"""
+Shared pytest configuration for the FoodApp test suite.
+"""
+import pytest
+
+
+SLOW_TEST_CLASSES = {
+    'recipe.tests.test_recipe_api.ImageUploadTests',
+}
+
+
+def pytest_collection_modifyitems(items):
+    """mark slow I/O-bound test classes without importing pytest in them"""
+    for item in items:
+        cls = getattr(item, 'cls', None)
+        if cls and f'{cls.__module__}.{cls.__qualname__}' in SLOW_TEST_CLASSES:
+            item.add_marker(pytest.mark.slow)
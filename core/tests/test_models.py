@@ -4,12 +4,20 @@ Tests for Models in the core application of the FoodApp project.
 from unittest.mock import patch
 from decimal import Decimal
 
-from django.test import TestCase
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.contrib.auth import get_user_model
 
 from core import models
 
 
+SAMPLE_EMAILS = [
+    ("test1@EXAMPLE.com", "test1@example.com"),
+    ("Test2@Example.com", "Test2@example.com"),
+    ("TEST3@EXAMPLE.COM", "TEST3@example.com"),
+    ("test4@example.COM", "test4@example.com"),
+]
+
+
 def create_user(
         email="user@example.com", password="testpass123"):
     """create and retrun a new user"""
@@ -32,17 +40,16 @@ class ModelTests(TestCase):
         """ using check_password becuz we gonna hash the pass """
         self.assertTrue(user.check_password(password))
 
+    @override_settings(PASSWORD_HASHERS=[
+        'django.contrib.auth.hashers.MD5PasswordHasher',
+    ])
     def test_new_user_email_normalized(self):
         """ Test If Email Was Normalized For new Users """
-        sample_emails = [
-            ("test1@EXAMPLE.com", "test1@example.com"),
-            ("Test2@Example.com", "Test2@example.com"),
-            ("TEST3@EXAMPLE.COM", "TEST3@example.com"),
-            ("test4@example.COM", "test4@example.com"),
-        ]
-        for email, excepted in sample_emails:
-            user = get_user_model().objects.create_user(email, "sample123")
-            self.assertEqual(user.email, excepted)
+        for email, excepted in SAMPLE_EMAILS:
+            with self.subTest(email=email):
+                user = get_user_model().objects.create_user(
+                    email, "sample123")
+                self.assertEqual(user.email, excepted)
 
     def test_new_user_without_email_raises_error(self):
         """ Test That Creating a user Without an email raises a value error """
@@ -86,6 +93,17 @@ class ModelTests(TestCase):
         )
         self.assertEqual(str(ingredient), ingredient.name)
 
+
+class ModelPureTests(SimpleTestCase):
+    """Test model helpers that don't need the database"""
+
+    def test_normalize_email(self):
+        """ Test the user manager normalizes email domains """
+        for email, excepted in SAMPLE_EMAILS:
+            with self.subTest(email=email):
+                normalized = get_user_model().objects.normalize_email(email)
+                self.assertEqual(normalized, excepted)
+
     @patch("core.models.uuid.uuid4")
     def test_recipe_file_name(self, mock_uuid):
         """test generating image path"""
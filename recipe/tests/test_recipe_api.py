@@ -3,14 +3,12 @@ tests for recipe APIs
 """
 
 from decimal import Decimal
-import tempfile
-import os
-
-from PIL import Image
-
+from functools import lru_cache
+import io
 
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
 
 from rest_framework import status
@@ -28,12 +26,22 @@ from recipe.serializers import (
 
 RECIPES_URL = reverse("recipe:recipe-list")
 
+_RECIPE_DEFAULTS = {
+    "title": "sample recipe title",
+    "time_minutes": 22,
+    "price": Decimal("5.25"),
+    "description": "sample recipe decription",
+    'link': "https://example.com"
+}
+
 
+@lru_cache(maxsize=None)
 def detail_url(recipe_id):
     """create and return a recipe detail URL"""
     return reverse('recipe:recipe-detail', args=[recipe_id])
 
 
+@lru_cache(maxsize=None)
 def image_upload_url(recipe_id):
     """create and return an image upload url"""
     return reverse('recipe:recipe-upload-image', args=[recipe_id])
@@ -41,17 +49,14 @@ def image_upload_url(recipe_id):
 
 def create_recipe(user, **params):
     """create and return a sample recipe"""
-    defaults = {
-        "title": "sample recipe title",
-        "time_minutes": 22,
-        "price": Decimal("5.25"),
-        "description": "sample recipe decription",
-        'link': "https://example.com"
-    }
-    defaults.update(params)
+    return Recipe.objects.create(user=user, **{**_RECIPE_DEFAULTS, **params})
 
-    recipe = Recipe.objects.create(user=user, **defaults)
-    return recipe
+
+def bulk_create_recipes(user, n, **params):
+    """create and return n sample recipes in a single query"""
+    fields = {**_RECIPE_DEFAULTS, **params}
+    recipes = [Recipe(user=user, **fields) for _ in range(n)]
+    return Recipe.objects.bulk_create(recipes)
 
 
 def create_user(**params):
@@ -59,7 +64,7 @@ def create_user(**params):
     return get_user_model().objects.create_user(**params)
 
 
-class PublicRecipeAPITests(TestCase):
+class PublicRecipeAPITests(SimpleTestCase):
     """test unauthenticated api requests"""
 
     def setUp(self):
@@ -75,18 +80,27 @@ class PublicRecipeAPITests(TestCase):
 class PrivateRecipeAPITests(TestCase):
     """"test for authenticated user api requests"""
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(
+            email='user@example.com', password='testpass123')
+        cls.new_user = create_user(
+            email="user7@example.com",
+            password="testpass789")
+
     def setUp(self):
         self.client = APIClient()
-        self.user = create_user(
-            email='user@example.com', password='testpass123')
         self.client.force_authenticate(self.user)
 
     def test_retrive_recipes(self):
         """test retriving a list of recipes"""
-        create_recipe(user=self.user)
-        create_recipe(user=self.user)
+        tag = Tag.objects.create(user=self.user, name="irani")
+        for recipe in bulk_create_recipes(user=self.user, n=5):
+            recipe.tags.add(tag)
 
-        res = self.client.get(RECIPES_URL)
+        # one query for the recipes and one for all of their tags
+        with self.assertNumQueries(2):
+            res = self.client.get(RECIPES_URL)
 
         recipes = Recipe.objects.all().order_by('-id')
         serializer = RecipeSerializer(recipes, many=True)
@@ -135,9 +149,9 @@ class PrivateRecipeAPITests(TestCase):
         res = self.client.post(RECIPES_URL, payload)
 
         self.assertEqual(res.status_code, status.HTTP_201_CREATED)
-        recipe = Recipe.objects.get(id=res.data['id'])
-        for k, v in payload.items():
-            self.assertEqual(getattr(recipe, k), v)
+        recipe = Recipe.objects.only(*payload, 'user').get(id=res.data['id'])
+        actual = {k: getattr(recipe, k) for k in payload}
+        self.assertEqual(actual, payload)
         self.assertEqual(recipe.user, self.user)
 
     def test_partial_update(self):
@@ -179,18 +193,15 @@ class PrivateRecipeAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         recipe.refresh_from_db()
-        for k, v in payload.items():
-            self.assertEqual(getattr(recipe, k), v)
+        actual = {k: getattr(recipe, k) for k in payload}
+        self.assertEqual(actual, payload)
         self.assertEqual(recipe.user, self.user)
 
     def test_update_user_returns_error(self):
         """test changin the recipe user throws error"""
-        new_user = create_user(
-            email="user7@example.com",
-            password="testpass789")
         recipe = create_recipe(user=self.user)
 
-        payload = {'user': new_user.id}
+        payload = {'user': self.new_user.id}
         url = detail_url(recipe.id)
         self.client.patch(url, payload)
         recipe.refresh_from_db()
@@ -208,10 +219,7 @@ class PrivateRecipeAPITests(TestCase):
 
     def test_delete_other_users_recipe_error(self):
         """test trying to delete another users recipe returnms error"""
-        new_user = create_user(
-            email="user7@example.com",
-            password="testpass789")
-        recipe = create_recipe(user=new_user)
+        recipe = create_recipe(user=self.new_user)
         url = detail_url(recipe.id)
         res = self.client.delete(url)
 
@@ -235,13 +243,10 @@ class PrivateRecipeAPITests(TestCase):
         recipes = Recipe.objects.filter(user=self.user)
         self.assertEqual(recipes.count(), 1)
         recipe = recipes[0]
-        self.assertEqual(recipe.tags.count(), 2)
-        for tag in payload['tags']:
-            exists = recipe.tags.filter(
-                name=tag['name'],
-                user=self.user
-            ).exists()
-            self.assertTrue(exists)
+        tags = list(recipe.tags.all())
+        self.assertEqual(len(tags), 2)
+        expected = {(tag['name'], self.user.id) for tag in payload['tags']}
+        self.assertEqual({(t.name, t.user_id) for t in tags}, expected)
 
     def test_creating_recipe_with_existing_tag(self):
         """test creating a recipe with existing tags"""
@@ -262,15 +267,12 @@ class PrivateRecipeAPITests(TestCase):
         recipes = Recipe.objects.filter(user=self.user)
         self.assertEqual(recipes.count(), 1)
         recipe = recipes[0]
-        self.assertEqual(recipe.tags.count(), 2)
+        tags = list(recipe.tags.all())
+        self.assertEqual(len(tags), 2)
         # this will check if its the same old tag in db
-        self.assertIn(tag_irani, recipe.tags.all())
-        for tag in payload['tags']:
-            exists = recipe.tags.filter(
-                name=tag['name'],
-                user=self.user
-            ).exists()
-            self.assertTrue(exists)
+        self.assertIn(tag_irani, tags)
+        expected = {(tag['name'], self.user.id) for tag in payload['tags']}
+        self.assertEqual({(t.name, t.user_id) for t in tags}, expected)
 
     def test_create_tag_on_update(self):
         """Testing creating tag on updating a recipe"""
@@ -306,8 +308,9 @@ class PrivateRecipeAPITests(TestCase):
         res = self.client.patch(url, payload, format="json")
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn(tag_breakfast, recipe.tags.all())
-        self.assertNotIn(tag_irani, recipe.tags.all())
+        tags = list(recipe.tags.all())
+        self.assertIn(tag_breakfast, tags)
+        self.assertNotIn(tag_irani, tags)
 
     def test_clear_recipe_tags(self):
         """Test clearing recipe tags"""
@@ -321,57 +324,55 @@ class PrivateRecipeAPITests(TestCase):
         url = detail_url(recipe.id)
         res = self.client.patch(url, payload, format="json")
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(recipe.tags.count(), 0)
-        self.assertNotIn(tag, recipe.tags.all())
+        self.assertFalse(recipe.tags.exists())
 
     def test_filter_by_tags(self):
         """Test filtering recipes by tags"""
-        r1 = create_recipe(user=self.user, title="qorme Sabzi")
-        r2 = create_recipe(user=self.user, title="makarooni")
+        r1, r2, _ = bulk_create_recipes(user=self.user, n=3)
         tag1 = Tag.objects.create(user=self.user, name="vegan")
         tag2 = Tag.objects.create(user=self.user, name="meatLover")
         r1.tags.add(tag1)
         r2.tags.add(tag2)
-        r3 = create_recipe(user=self.user, title="dampokhtak")
 
         params = {'tags': f"{tag1.id},{tag2.id}"}
         res = self.client.get(RECIPES_URL, params)
 
-        s1 = RecipeSerializer(r1)
-        s2 = RecipeSerializer(r2)
-        s3 = RecipeSerializer(r3)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        returned_ids = {recipe['id'] for recipe in res.data}
+        self.assertEqual(returned_ids, {r1.id, r2.id})
 
     def test_filter_by_ingredients(self):
         """test filtering recipes by ingredients"""
-        r1 = create_recipe(user=self.user, title="chai")
-        r2 = create_recipe(user=self.user, title="qahve")
+        r1, r2, _ = bulk_create_recipes(user=self.user, n=3)
         ingredient1 = Ingredient.objects.create(user=self.user, name="shekar")
         ingredient2 = Ingredient.objects.create(user=self.user, name="namak")
         r1.ingredients.add(ingredient1)
         r2.ingredients.add(ingredient2)
-        r3 = create_recipe(user=self.user, title="felfel")
 
         params = {'ingredients': f"{ingredient1.id},{ingredient2.id}"}
         res = self.client.get(RECIPES_URL, params)
 
-        s1 = RecipeSerializer(r1)
-        s2 = RecipeSerializer(r2)
-        s3 = RecipeSerializer(r3)
-        self.assertIn(s1.data, res.data)
-        self.assertIn(s2.data, res.data)
-        self.assertNotIn(s3.data, res.data)
+        returned_ids = {recipe['id'] for recipe in res.data}
+        self.assertEqual(returned_ids, {r1.id, r2.id})
 
 
+@override_settings(STORAGES={
+    'default': {
+        'BACKEND': 'django.core.files.storage.InMemoryStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+})
 class ImageUploadTests(TestCase):
     """tests for the iamge upload api"""
 
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(email='user@example.com',
+                               password="passweord123")
+
     def setUp(self):
         self.client = APIClient()
-        self.user = create_user(email='user@example.com',
-                                password="passweord123")
         self.client.force_authenticate(self.user)
         self.recipe = create_recipe(user=self.user)
 
@@ -380,18 +381,21 @@ class ImageUploadTests(TestCase):
 
     def test_uploadimage(self):
         """testing uploading a image"""
+        from PIL import Image
+
         url = image_upload_url(self.recipe.id)
-        with tempfile.NamedTemporaryFile(suffix='.jpg') as image_file:
-            img = Image.new('RGB', (10, 10))
-            img.save(image_file, format="JPEG")
-            image_file.seek(0)
-            payload = {"image": image_file}
-            res = self.client.post(url, payload, format="multipart")
+        buf = io.BytesIO()
+        Image.new('RGB', (10, 10)).save(buf, format="JPEG")
+        image_file = SimpleUploadedFile(
+            'example.jpg', buf.getvalue(), content_type='image/jpeg')
+        payload = {"image": image_file}
+        res = self.client.post(url, payload, format="multipart")
 
         self.recipe.refresh_from_db()
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertIn('image', res.data)
-        self.assertTrue(os.path.exists(self.recipe.image.path))
+        self.assertTrue(
+            self.recipe.image.storage.exists(self.recipe.image.name))
 
     def test_upload_image_bad_request(self):
         """test uploading invalid image"""
@@ -58,7 +58,7 @@ class RecipeViewSet(viewsets.ModelViewSet):
 
         return queryset.filter(
             user=self.request.user
-        ).order_by('-id').distinct()
+        ).prefetch_related('tags').order_by('-id').distinct()
 
     def get_serializer_class(self):
         """return the serializer class for requests"""